@@ -26,12 +26,17 @@ WRONG_ESCAPE_PATTERN = re.compile(r'%(?![a-fA-F\d]{2})')
 
 
 def collapse_white_spaces(s):
-    return WHITESPACES_PATTERN.sub(' ', s).strip(' ')
+    if '\xa0' in s:
+        # str.split() would also split on non-breaking spaces
+        return WHITESPACES_PATTERN.sub(' ', s).strip(' ')
+    return ' '.join(s.split())
 
 
 def is_idrefs(value):
-    return isinstance(value, str) and \
-        all(NCNAME_PATTERN.match(x) is not None for x in value.split())
+    if not isinstance(value, str):
+        return False
+    match = NCNAME_PATTERN.match  # bound once for all the items
+    return all(match(x) is not None for x in value.split())
 
 
 ###
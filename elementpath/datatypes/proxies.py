@@ -38,9 +38,12 @@ class BooleanProxy(metaclass=AtomicTypeABCMeta):
         elif not isinstance(value, str):
             raise TypeError('invalid type {!r} for xs:{}'.format(type(value), cls.name))
 
-        if value.strip() not in {'true', 'false', '1', '0'}:
-            raise ValueError('invalid value {!r} for xs:{}'.format(value, cls.name))
-        return 't' in value or '1' in value
+        literal = value.strip()
+        if literal in {'true', '1'}:
+            return True
+        elif literal in {'false', '0'}:
+            return False
+        raise ValueError('invalid value {!r} for xs:{}'.format(value, cls.name))
 
     @classmethod
     def __subclasshook__(cls, subclass):
@@ -39,8 +39,7 @@ class AbstractQName(metaclass=AtomicTypeABCMeta):
         if match is None:
             raise ValueError('invalid value {!r} for an xs:QName'.format(self.qname))
 
-        self.prefix = match.groupdict()['prefix']
-        self.local_name = match.groupdict()['local']
+        self.prefix, self.local_name = match.groups()
         if not uri and self.prefix:
             msg = '{!r}: cannot associate a non-empty prefix with no namespace'
             raise ValueError(msg.format(self))
@@ -65,7 +65,7 @@ class UntypedAtomic(metaclass=AtomicTypeABCMeta):
             value = self.value.strip()
             if value not in {'0', '1', 'true', 'false'}:
                 raise ValueError("{!r} cannot be cast to xs:boolean".format(self.value))
-            return value in ('1', 'true'), other
+            return value in {'1', 'true'}, other
         elif isinstance(other, int):
             return float(self.value), other
         elif isinstance(other, str):
@@ -8,7 +8,7 @@
 # @author Davide Brunato <brunato@sissa.it>
 #
 from decimal import Decimal
-from urllib.parse import urlparse
+from urllib.parse import urlsplit
 
 from .helpers import collapse_white_spaces, WRONG_ESCAPE_PATTERN
 from .atomic_types import AnyAtomicType
@@ -97,7 +97,7 @@ class AnyURI(AnyAtomicType):
             raise cls.invalid_type(value)
 
         try:
-            url_parts = urlparse(value)
+            url_parts = urlsplit(value)
             _ = url_parts.port  # check invalid port!
         except ValueError as err:
             msg = 'invalid value {!r} for xs:{} ({})'
@@ -15,7 +15,7 @@ import re
 from unicodedata import name as unicode_name
 from decimal import Decimal, DecimalException
 from itertools import takewhile
-from abc import ABCMeta
+from functools import lru_cache
 from collections.abc import MutableSequence
 
 #
@@ -45,6 +45,10 @@ SPECIAL_SYMBOLS = frozenset((
 
 SPACE_PATTERN = re.compile(r'\s')
 
+# Symbol patterns made by a word and a lookahead or a word boundary based suffix,
+# like the patterns of keywords, functions and axes.
+WORD_SYMBOL_PATTERN = re.compile(r'^\\b([A-Za-z_][\w\-:]*)((?:\\b)?\(\?[=!].*)$')
+
 
 class ParseError(SyntaxError):
     """An error when parsing source with TDOP parser."""
@@ -186,6 +190,9 @@ class Token(MutableSequence):
     def insert(self, i, item):
         self._items.insert(i, item)
 
+    def append(self, item):
+        self._items.append(item)
+
     def __str__(self):
         if self.symbol in SPECIAL_SYMBOLS:
             return '%r %s' % (self.value, self.symbol[1:-1])
@@ -320,6 +327,93 @@ class Token(MutableSequence):
         return ValueError(message)
 
 
+def trie_alternation(words):
+    """
+    Returns a regex alternation for a sequence of words, built on a prefix tree
+    so the common prefixes are matched only once. Eg. 'unsignedLong', 'unsignedInt'
+    and 'unsignedByte' are joined into "unsigned(?:Byte|Int|Long)".
+
+    :param words: a sequence of words, that have to not contain spaces.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = None  # word termination mark
+
+    def build_alternation(node):
+        branches = [re.escape(k) + build_alternation(v) for k, v in sorted(node.items()) if k]
+        if '' in node:
+            return '(?:%s)?' % '|'.join(branches) if branches else ''
+        elif len(branches) <= 1:
+            return ''.join(branches)
+        return '(?:%s)' % '|'.join(branches)
+
+    return build_alternation(trie)
+
+
+def group_word_patterns(patterns):
+    """
+    Groups the word symbol patterns that share the same suffix into a single
+    pattern, using a trie alternation for the words. Other patterns are kept.
+
+    :param patterns: a sequence of symbol patterns.
+    """
+    groups = {}
+    other_patterns = []
+    for p in patterns:
+        match = WORD_SYMBOL_PATTERN.match(p)
+        if match is None:
+            other_patterns.append(p)
+        else:
+            groups.setdefault(match.group(2), []).append(match.group(1))
+
+    for suffix, words in groups.items():
+        if len(words) == 1:
+            other_patterns.append(r'\b%s%s' % (words[0], suffix))
+        else:
+            other_patterns.append(r'\b%s%s' % (trie_alternation(words), suffix))
+    return other_patterns
+
+
+@lru_cache(maxsize=32)
+def _compile_tokenizer(patterns, literals_pattern, name_pattern):
+    """
+    Compiles the tokenizer regex from a tuple of symbol patterns. The results are cached
+    for reusing the same tokenizer with parsers having the same symbol table, like the
+    instances bound to the same schema.
+    """
+    tokenizer_pattern_template = r"""
+            (%s) |       # Literals
+            (%s|[%s]) |  # Symbols
+            (%s) |       # Names
+            (\S) |       # Unknown symbols
+            \s+          # Skip extra spaces
+        """
+    string_patterns = []
+    character_patterns = []
+
+    for p in patterns:
+        if ' ' in p:
+            raise ValueError('pattern %r contains spaces' % p)
+
+    for p in group_word_patterns(patterns):
+        length = len(p)
+        if length == 1 or length == 2 and p[0] == '\\':
+            character_patterns.append(p)
+        else:
+            string_patterns.append(p)
+
+    pattern = tokenizer_pattern_template % (
+        literals_pattern,
+        '|'.join(sorted(string_patterns, key=lambda x: -len(x))),
+        ''.join(character_patterns),
+        name_pattern
+    )
+    return re.compile(pattern, re.VERBOSE)
+
+
 class ParserMeta(type):
 
     def __new__(mcs, name, bases, namespace):
@@ -343,11 +437,13 @@ class ParserMeta(type):
         if 'tokenizer' not in namespace:
             cls.tokenizer = None
         if 'SYMBOLS' not in namespace:
-            cls.SYMBOLS = set()
+            cls.SYMBOLS = frozenset()
             for base_class in bases:
                 if hasattr(base_class, 'SYMBOLS'):
-                    cls.SYMBOLS.update(base_class.SYMBOLS)
+                    cls.SYMBOLS = frozenset(base_class.SYMBOLS)
                     break
+        elif not isinstance(cls.SYMBOLS, frozenset):
+            cls.SYMBOLS = frozenset(cls.SYMBOLS)
         if 'symbol_table' not in namespace:
             cls.symbol_table = {}
             for base_class in bases:
@@ -363,7 +459,8 @@ class Parser(metaclass=ParserMeta):
 
     :cvar SYMBOLS: the symbols of the definable tokens for the parser. In the base class it's an \
     immutable set that contains the symbols for special tokens (literals, names and end-token).\
-    Has to be extended in a concrete parser adding all the symbols of the language.
+    Has to be extended in a concrete parser adding all the symbols of the language. It's \
+    always stored as a frozenset by the parser's metaclass.
     :cvar symbol_table: a dictionary that stores the token classes defined for the language.
     :type symbol_table: dict
     :cvar token_base_class: the base class for creating language's token classes.
@@ -652,9 +749,8 @@ class Parser(metaclass=ParserMeta):
                 '__qualname__': token_class_name,
                 '__return__': None
             })
-            token_class = ABCMeta(token_class_name, token_class_bases, kwargs)
+            token_class = type(token_class_name, token_class_bases, kwargs)
             cls.symbol_table[symbol] = token_class
-            MutableSequence.register(token_class)
             setattr(sys.modules[cls.__module__], token_class_name, token_class)
 
         else:
@@ -770,37 +866,14 @@ class Parser(metaclass=ParserMeta):
 
         A regular expression is created from the symbol table of the parser using a template.
         The symbols are inserted in the template putting the longer symbols first. Symbols and
-        their patterns can't contain spaces.
+        their patterns can't contain spaces. The patterns of word symbols with the same suffix,
+        like function names, are merged into a single trie based alternation.
 
         :param symbol_table: a dictionary containing the token classes of the formal language.
         """
-        tokenizer_pattern_template = r"""
-            (%s) |       # Literals
-            (%s|[%s]) |  # Symbols
-            (%s) |       # Names
-            (\S) |       # Unknown symbols
-            \s+          # Skip extra spaces
-        """
-        patterns = [
+        patterns = tuple(
             t.pattern.replace('#', r'\#') for s, t in symbol_table.items()
             if s not in SPECIAL_SYMBOLS
-        ]
-        string_patterns = []
-        character_patterns = []
-
-        for p in patterns:
-            if ' ' in p:
-                raise ValueError('pattern %r contains spaces' % p)
-            length = len(p)
-            if length == 1 or length == 2 and p[0] == '\\':
-                character_patterns.append(p)
-            else:
-                string_patterns.append(p)
-
-        pattern = tokenizer_pattern_template % (
-            cls.literals_pattern.pattern,
-            '|'.join(sorted(string_patterns, key=lambda x: -len(x))),
-            ''.join(character_patterns),
-            cls.name_pattern.pattern
         )
-        return re.compile(pattern, re.VERBOSE)
+        return _compile_tokenizer(patterns, cls.literals_pattern.pattern,
+                                  cls.name_pattern.pattern)
@@ -7,6 +7,7 @@
 #
 # @author Davide Brunato <brunato@sissa.it>
 #
+from ..xpath_context import XPathSchemaContext
 from ..xpath_nodes import NamespaceNode, is_element_node
 from .xpath1_functions import XPath1Parser
 
@@ -27,7 +28,13 @@ def select(self, context=None):
     if context is None:
         raise self.missing_context()
 
-    for _ in context.iter_attributes():
+    if self[0].symbol == '(name)' and not isinstance(context, XPathSchemaContext):
+        # Only a named attribute can match: skip the attributes with other names
+        attributes = context.iter_attributes(self[0].value)
+    else:
+        attributes = context.iter_attributes()
+
+    for _ in attributes:
         yield from self[0].select(context)
 
 
@@ -97,9 +97,9 @@ class XPath1Parser(Parser):
 
     # Labels and symbols admitted after a path step
     PATH_STEP_LABELS = ('axis', 'kind test')
-    PATH_STEP_SYMBOLS = {
+    PATH_STEP_SYMBOLS = frozenset((
         '(integer)', '(string)', '(float)', '(decimal)', '(name)', '*', '@', '..', '.', '{'
-    }
+    ))
 
     # Class attributes for compatibility with XPath 2.0+
     schema = None           # XPath 1.0 doesn't have schema bindings
@@ -257,6 +257,11 @@ class XPath1Parser(Parser):
         else:
             raise self.next_token.wrong_syntax(message)
 
+    def next_is_path_step_token(self):
+        """Returns `True` if the next token can be a path step, `False` otherwise."""
+        return self.next_token.label in self.PATH_STEP_LABELS or \
+            self.next_token.symbol in self.PATH_STEP_SYMBOLS
+
     ###
     # Type checking (used in XPath 2.0)
     def is_instance(self, obj, type_qname):
@@ -968,7 +973,7 @@ def select(self, context=None):
 # Path expressions
 @method('//', bp=75)
 def nud(self):
-    if self.parser.next_token.label not in self.parser.PATH_STEP_LABELS:
+    if not self.parser.next_is_path_step_token():
         self.parser.expected_name(*self.parser.PATH_STEP_SYMBOLS)
 
     self[:] = self.parser.expression(75),
@@ -977,7 +982,7 @@ def nud(self):
 
 @method('/', bp=75)
 def nud(self):
-    if self.parser.next_token.label not in self.parser.PATH_STEP_LABELS:
+    if not self.parser.next_is_path_step_token():
         try:
             self.parser.expected_name(*self.parser.PATH_STEP_SYMBOLS)
         except SyntaxError:
@@ -990,7 +995,7 @@ def nud(self):
 @method('//')
 @method('/')
 def led(self, left):
-    if self.parser.next_token.label not in self.parser.PATH_STEP_LABELS:
+    if not self.parser.next_is_path_step_token():
         self.parser.expected_name(*self.parser.PATH_STEP_SYMBOLS)
 
     self[:] = left, self.parser.expression(75)
@@ -19,6 +19,7 @@ import os.path
 import unicodedata
 from copy import copy
 from decimal import Decimal, DecimalException
+from itertools import islice
 from string import ascii_letters
 from urllib.parse import urlsplit, quote as urllib_quote
 
@@ -90,7 +91,8 @@ def evaluate(self, context=None):
     if context is None:
         raise self.missing_context()
 
-    prefix = self.get_argument(context=copy(context))
+    with context.scoped():
+        prefix = self.get_argument(context)
     if prefix is None:
         prefix = ''
     if not isinstance(prefix, str):
@@ -99,15 +101,17 @@ def evaluate(self, context=None):
     elem = self.get_argument(context, index=1)
     if not is_element_node(elem):
         raise self.error('FORG0006', '2nd argument %r is not an element node' % elem)
-    ns_uris = {get_namespace(e.tag) for e in elem.iter()}
-    for p, uri in self.parser.namespaces.items():
-        if uri in ns_uris:
-            if p == prefix:
-                if not prefix or uri:
-                    return AnyURI(uri)
-                else:
-                    msg = 'Prefix %r is associated to no namespace'
-                    raise self.error('XPST0081', msg % prefix)
+    try:
+        uri = self.parser.namespaces[prefix]
+    except KeyError:
+        return
+
+    # Stop the scan at the first element that uses the namespace
+    if any(get_namespace(e.tag) == uri for e in elem.iter()):
+        if not prefix or uri:
+            return AnyURI(uri)
+        msg = 'Prefix %r is associated to no namespace'
+        raise self.error('XPST0081', msg % prefix)
 
 
 @method(function('in-scope-prefixes', nargs=1))
@@ -137,7 +141,12 @@ def select(self, context=None):
 
 @method(function('resolve-QName', nargs=2))
 def evaluate(self, context=None):
-    qname = self.get_argument(context=copy(context))
+    if context is None:
+        qname = self.get_argument(context)
+    else:
+        with context.scoped():
+            qname = self.get_argument(context)
+
     if qname is None:
         return
     elif not isinstance(qname, str):
@@ -155,21 +164,21 @@ def evaluate(self, context=None):
     if match is None:
         raise self.error('FOCA0002', '1st argument must be an xs:QName')
 
-    prefix = match.groupdict()['prefix'] or ''
+    prefix, local_name = match.groups()
+    if prefix is None:
+        prefix = ''
     if prefix == 'xml':
         return QName(XML_NAMESPACE, qname)
 
     try:
-        nsmap = {**self.parser.namespaces, **elem.nsmap}
-    except AttributeError:
-        nsmap = self.parser.namespaces
-
-    for pfx, uri in nsmap.items():
-        if pfx == prefix:
-            if pfx:
-                return QName(uri, '{}:{}'.format(pfx, match.groupdict()['local']))
-            else:
-                return QName(uri, match.groupdict()['local'])
+        uri = elem.nsmap[prefix]
+    except (AttributeError, KeyError):
+        uri = self.parser.namespaces.get(prefix)
+
+    if uri is not None:
+        if prefix:
+            return QName(uri, '{}:{}'.format(prefix, local_name))
+        return QName(uri, local_name)
 
     if prefix or '' in self.parser.namespaces:
         raise self.error('FONS0004', 'no namespace found for prefix %r' % prefix)
@@ -292,16 +301,16 @@ def evaluate(self, context=None):
         return
     elif isinstance(item, float) and math.isnan(item):
         return item
+    elif isinstance(item, (float, int, Decimal)) and not isinstance(item, bool):
+        return abs(item)
     elif is_xpath_node(item):
         value = self.string_value(item)
         try:
             return abs(Decimal(value))
         except DecimalException:
             raise self.error('FOCA0002', "invalid string value {!r} for {!r}".format(value, item))
-    elif isinstance(item, bool) or not isinstance(item, (float, int, Decimal)):
-        raise self.error('XPTY0004', "invalid argument type {!r}".format(type(item)))
     else:
-        return abs(item)
+        raise self.error('XPTY0004', "invalid argument type {!r}".format(type(item)))
 
 
 ###
@@ -399,27 +408,29 @@ def evaluate(self, context=None):
 @method(function('empty', nargs=1))
 @method(function('exists', nargs=1))
 def evaluate(self, context=None):
-    return next(iter(self.select(context)))
+    if self[0].symbol == '$':
+        # A variable reference: check the value without iterating it
+        value = self[0].evaluate(context)
+        exists = value is not None and (not isinstance(value, list) or bool(value))
+    else:
+        try:
+            next(iter(self[0].select(context)))
+        except StopIteration:
+            exists = False
+        else:
+            exists = True
+
+    return exists if self.symbol == 'exists' else not exists
 
 
 @method('empty')
+@method('exists')
 def select(self, context=None):
-    try:
-        next(iter(self[0].select(context)))
-    except StopIteration:
-        yield True
-    else:
-        yield False
+    yield self.evaluate(context)
 
 
-@method('exists')
-def select(self, context=None):
-    try:
-        next(iter(self[0].select(context)))
-    except StopIteration:
-        yield False
-    else:
-        yield True
+# Types whose instances have a hash consistent with equality among themselves
+HASHED_VALUE_TYPES = frozenset((str, int, bool, UntypedAtomic, AnyURI, QName))
 
 
 @method(function('distinct-values', nargs=(1, 2)))
@@ -427,7 +438,9 @@ def select(self, context=None):
 
     def distinct_values():
         nan = False
-        results = []
+        numbers = []  # the distinct numeric values, for the isclose() checks
+        values_map = {}  # the distinct values grouped by type
+
         for item in self[0].select(context):
             value = self.data_value(item)
             if context is not None:
@@ -437,14 +450,27 @@ def select(self, context=None):
                     if not nan:
                         yield value
                         nan = True
-                elif all(not math.isclose(value, x, rel_tol=1E-7, abs_tol=0)
-                         for x in results if isinstance(x, (int, Decimal, float))):
-                    yield value
-                    results.append(value)
+                    continue
+                elif any(math.isclose(value, x, rel_tol=1E-7, abs_tol=0)
+                         for x in numbers):
+                    continue
+            else:
+                # Values of other types (eg. untypedAtomic) can be equal but have
+                # a different hash, so only the values of the same type are hashed.
+                value_type = type(value)
+                if value in values_map.get(value_type, ()) or \
+                        any(value == x for t, values in values_map.items()
+                            if t is not value_type for x in values):
+                    continue
 
-            elif value not in results:
-                yield value
-                results.append(value)
+            yield value
+            if isinstance(value, (int, Decimal, float)):
+                numbers.append(value)
+
+            if type(value) in HASHED_VALUE_TYPES:
+                values_map.setdefault(type(value), set()).add(value)
+            else:
+                values_map.setdefault(type(value), []).append(value)
 
     if len(self) > 1:
         with self.use_locale(collation=self.get_argument(context, 1)):
@@ -501,7 +527,7 @@ def select(self, context=None):
 
 @method(function('reverse', nargs=1))
 def select(self, context=None):
-    yield from reversed([x for x in self[0].select(context)])
+    yield from reversed(list(self[0].select(context)))
 
 
 @method(function('subsequence', nargs=(2, 3)))
@@ -519,64 +545,51 @@ def select(self, context=None):
         if not math.isnan(length) and not math.isinf(length):
             length = round(length)
 
+        ending_loc = starting_loc + length
+        if context is not None:
+            status = context.item, context.position, context.size, context.axis
+
         for pos, result in enumerate(self[0].select(context), start=1):
-            if starting_loc <= pos < starting_loc + length:
+            if pos >= ending_loc:
+                # Skip the rest of the sequence, restoring the context status
+                if context is not None:
+                    context.item, context.position, context.size, context.axis = status
+                break
+            elif starting_loc <= pos < ending_loc:
                 yield result
 
 
 @method(function('unordered', nargs=1))
 def select(self, context=None):
-    yield from sorted([x for x in self[0].select(context)], key=lambda x: self.string_value(x))
+    yield from sorted(self[0].select(context), key=self.string_value)
 
 
 ###
 # Cardinality functions for sequences
 @method(function('zero-or-one', nargs=1))
 def select(self, context=None):
-    results = iter(self[0].select(context))
-    try:
-        item = next(results)
-    except StopIteration:
-        return
-
-    try:
-        next(results)
-    except StopIteration:
-        yield item
-    else:
+    results = list(islice(self[0].select(context), 2))
+    if len(results) > 1:
         raise self.error('FORG0003')
+    yield from results
 
 
 @method(function('one-or-more', nargs=1))
 def select(self, context=None):
     results = iter(self[0].select(context))
-    try:
-        item = next(results)
-    except StopIteration:
-        raise self.error('FORG0004') from None
-    else:
-        yield item
-        while True:
-            try:
-                yield next(results)
-            except StopIteration:
-                break
+    head = list(islice(results, 1))
+    if not head:
+        raise self.error('FORG0004')
+    yield head[0]
+    yield from results
 
 
 @method(function('exactly-one', nargs=1))
 def select(self, context=None):
-    results = iter(self[0].select(context))
-    try:
-        item = next(results)
-    except StopIteration:
-        raise self.error('FORG0005') from None
-    else:
-        try:
-            next(results)
-        except StopIteration:
-            yield item
-        else:
-            raise self.error('FORG0005')
+    results = list(islice(self[0].select(context), 2))
+    if len(results) != 1:
+        raise self.error('FORG0005')
+    yield results[0]
 
 
 ###
@@ -773,21 +786,21 @@ def evaluate(self, context=None):
 ###
 # String functions
 
-@method(function('codepoints-to-string', nargs=1))
-def evaluate(self, context=None):
+def xml10_chr(cp: int):
+    if not isinstance(cp, int):
+        raise TypeError("invalid type {} for codepoint {}".format(type(cp), cp))
+    elif 0x20 <= cp <= 0xD7FF \
+            or cp in {0x9, 0xA, 0xD} \
+            or 0xE000 <= cp <= 0xFFFD \
+            or 0x10000 <= cp <= 0x10FFFF:
+        return chr(cp)
+    raise ValueError("{} is not a valid XML 1.0 codepoint".format(cp))
 
-    def xml10_chr(cp: int):
-        if not isinstance(cp, int):
-            raise TypeError("invalid type {} for codepoint {}".format(type(cp), cp))
-        elif cp in {0x9, 0xA, 0xD} \
-                or 0x20 <= cp <= 0xD7FF \
-                or 0xE000 <= cp <= 0xFFFD \
-                or 0x10000 <= cp <= 0x10FFFF:
-            return chr(cp)
-        raise ValueError("{} is not a valid XML 1.0 codepoint".format(cp))
 
+@method(function('codepoints-to-string', nargs=1))
+def evaluate(self, context=None):
     try:
-        return ''.join(xml10_chr(cp) for cp in self[0].select(context))
+        return ''.join(map(xml10_chr, self[0].select(context)))
     except TypeError as err:
         code = 'XPTY0004' if "'str'" in str(err) else 'FORG0006'
         raise self.error(code, err) from None
@@ -798,7 +811,7 @@ def evaluate(self, context=None):
 @method(function('string-to-codepoints', nargs=1))
 def evaluate(self, context=None):
     try:
-        return [ord(c) for c in self[0].evaluate(context)] or None
+        return list(map(ord, self[0].evaluate(context))) or None
     except TypeError:
         raise self.error('XPTY0004', 'an xs:string required') from None
 
@@ -898,12 +911,16 @@ def evaluate(self, context=None):
     return '' if iri is None else urllib_quote(iri, safe='-_.!~*\'()#;/?:@&=+$,[]%')
 
 
+# Printable ASCII characters, that are not escaped by escape-html-uri()
+ESCAPE_HTML_URI_SAFE = ''.join(chr(cp) for cp in range(32, 127))
+
+
 @method(function('escape-html-uri', nargs=1))
 def evaluate(self, context=None):
     uri = self.get_argument(context, cls=str)
     if uri is None:
         return ''
-    return urllib_quote(uri, safe=''.join(chr(cp) for cp in range(32, 127)))
+    return urllib_quote(uri, safe=ESCAPE_HTML_URI_SAFE)
 
 
 @method(function('starts-with', nargs=(2, 3)))
@@ -952,58 +969,51 @@ def evaluate(self, context=None):
 
 ###
 # Functions on durations, dates and times
-@method(function('years-from-duration', nargs=1))
-def evaluate(self, context=None):
-    item = self.get_argument(context, cls=Duration)
-    if item is None:
-        return
-    else:
-        return item.months // 12 if item.months >= 0 else -(abs(item.months) // 12)
+# Duration components: the attribute, its divisor and its modulus
+DURATION_COMPONENTS = {
+    'years-from-duration': ('months', 12, None),
+    'months-from-duration': ('months', None, 12),
+    'days-from-duration': ('seconds', 86400, None),
+    'hours-from-duration': ('seconds', 3600, 24),
+    'minutes-from-duration': ('seconds', 60, 60),
+    'seconds-from-duration': ('seconds', None, 60),
+}
 
 
+@method(function('years-from-duration', nargs=1))
 @method(function('months-from-duration', nargs=1))
-def evaluate(self, context=None):
-    item = self.get_argument(context, cls=Duration)
-    if item is None:
-        return
-    else:
-        return item.months % 12 if item.months >= 0 else -(abs(item.months) % 12)
-
-
 @method(function('days-from-duration', nargs=1))
-def evaluate(self, context=None):
-    item = self.get_argument(context, cls=Duration)
-    if item is None:
-        return
-    else:
-        return item.seconds // 86400 if item.seconds >= 0 else -(abs(item.seconds) // 86400)
-
-
 @method(function('hours-from-duration', nargs=1))
-def evaluate(self, context=None):
-    item = self.get_argument(context, cls=Duration)
-    if item is None:
-        return
-    else:
-        return item.seconds // 3600 % 24 if item.seconds >= 0 else -(abs(item.seconds) // 3600 % 24)
-
-
 @method(function('minutes-from-duration', nargs=1))
-def evaluate(self, context=None):
-    item = self.get_argument(context, cls=Duration)
-    if item is None:
-        return
-    else:
-        return item.seconds // 60 % 60 if item.seconds >= 0 else -(abs(item.seconds) // 60 % 60)
-
-
 @method(function('seconds-from-duration', nargs=1))
 def evaluate(self, context=None):
     item = self.get_argument(context, cls=Duration)
     if item is None:
         return
-    else:
-        return item.seconds % 60 if item.seconds >= 0 else -(abs(item.seconds) % 60)
+
+    attr, divisor, modulus = DURATION_COMPONENTS[self.symbol]
+    value = getattr(item, attr)
+    result = abs(value)
+    if divisor is not None:
+        result //= divisor
+    if modulus is not None:
+        result %= modulus
+    return result if value >= 0 else -result
+
+
+# Date and time components, mapped to the attributes of the XSD datetime types
+DATETIME_COMPONENTS = {
+    'year-from-dateTime': 'year',
+    'month-from-dateTime': 'month',
+    'day-from-dateTime': 'day',
+    'hours-from-dateTime': 'hour',
+    'minutes-from-dateTime': 'minute',
+    'year-from-date': 'year',
+    'month-from-date': 'month',
+    'day-from-date': 'day',
+    'hours-from-time': 'hour',
+    'minutes-from-time': 'minute',
+}
 
 
 @method(function('year-from-dateTime', nargs=1))
@@ -1017,16 +1027,10 @@ def evaluate(self, context=None):
     item = self.get_argument(context, cls=cls)
     if item is None:
         return
-    elif self.symbol.startswith('year'):
-        return item.year
-    elif self.symbol.startswith('month'):
-        return item.month
-    elif self.symbol.startswith('day'):
-        return item.day
-    elif self.symbol.startswith('hour'):
-        return item.hour
-    elif self.symbol.startswith('minute'):
-        return item.minute
+
+    attr = DATETIME_COMPONENTS.get(self.symbol)
+    if attr is not None:
+        return getattr(item, attr)
     elif item.microsecond:
         return Decimal('{}.{}'.format(item.second, item.microsecond))
     else:
@@ -1051,27 +1055,20 @@ def evaluate(self, context=None):
     item = self.get_argument(context, cls=cls)
     if item is None:
         return
-    elif self.symbol.startswith('year'):
-        return item.year
-    elif self.symbol.startswith('month'):
-        return item.month
-    elif self.symbol.startswith('day'):
-        return item.day
+
+    attr = DATETIME_COMPONENTS.get(self.symbol)
+    if attr is not None:
+        return getattr(item, attr)
     elif item.tzinfo is None:
         return
     return DayTimeDuration(seconds=item.tzinfo.offset.total_seconds())
 
 
 @method(function('hours-from-time', nargs=1))
-def evaluate(self, context=None):
-    item = self.get_argument(context, cls=Time)
-    return None if item is None else item.hour
-
-
 @method(function('minutes-from-time', nargs=1))
 def evaluate(self, context=None):
     item = self.get_argument(context, cls=Time)
-    return None if item is None else item.minute
+    return None if item is None else getattr(item, DATETIME_COMPONENTS[self.symbol])
 
 
 @method(function('seconds-from-time', nargs=1))
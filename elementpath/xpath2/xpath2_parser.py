@@ -10,12 +10,11 @@
 """
 XPath 2.0 implementation - part 1 (XPath2Parser class and operators)
 """
-from abc import ABCMeta
 import locale
 import math
 import operator
-from collections.abc import MutableSequence
 from copy import copy
+from itertools import islice
 from decimal import Decimal, DivisionByZero
 from urllib.parse import urlparse
 
@@ -25,14 +24,78 @@ from ..namespaces import XSD_NAMESPACE, XML_NAMESPACE, XLINK_NAMESPACE, \
     XPATH_FUNCTIONS_NAMESPACE, XQT_ERRORS_NAMESPACE, XSD_NOTATION, \
     XSD_ANY_ATOMIC_TYPE, get_namespace, get_prefixed_name, get_expanded_name
 from ..datatypes import UntypedAtomic, QName, AnyURI, Duration, Integer
-from ..xpath_nodes import TypedElement, is_xpath_node, \
-    match_attribute_node, is_element_node, is_document_node
+from ..xpath_nodes import AttributeNode, TypedElement, TypedAttribute, is_xpath_node, \
+    match_attribute_node, is_etree_element, is_element_node, is_document_node
 from ..xpath_token import UNICODE_CODEPOINT_COLLATION
 from ..xpath1 import XPath1Parser
 from ..xpath_context import XPathSchemaContext
 from ..schema_proxy import AbstractSchemaProxy
 
 
+VALUE_OPERATORS_MAP = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'gt': operator.gt,
+    'ge': operator.ge,
+    'lt': operator.lt,
+    'le': operator.le,
+}
+
+
+###
+# Shared nud() and evaluate() methods of constructor token classes
+def constructor_nud(self):
+    try:
+        self.parser.advance('(')
+        self.append(self.parser.expression(5))
+        if self.parser.next_token.symbol == ',':
+            raise self.wrong_nargs('Too many arguments: expected at most 1 argument')
+        self.parser.advance(')')
+        self.value = None
+    except SyntaxError:
+        raise self.error('XPST0017') from None
+    return self
+
+
+def constructor_evaluate(self, context=None):
+    arg = self.data_value(self.get_argument(context))
+    if arg is None:
+        return []
+
+    try:
+        if isinstance(arg, UntypedAtomic):
+            return self.cast(arg.value)
+        return self.cast(arg)
+    except ElementPathError:
+        raise
+    except (TypeError, ValueError) as err:
+        raise self.error('FORG0001', err) from None
+
+
+def schema_constructor_nud(self):
+    self.parser.advance('(')
+    self.append(self.parser.expression(5))
+    self.parser.advance(')')
+
+    try:
+        self.value = self.evaluate()  # Static context evaluation
+    except MissingContextError:
+        self.value = None
+    return self
+
+
+def schema_constructor_evaluate(self, context=None):
+    arg = self.get_argument(context)
+    if arg is None:
+        return []
+
+    value = self.string_value(arg)
+    try:
+        return self.parser.schema.cast_as(value, self.atomic_type)
+    except (TypeError, ValueError) as err:
+        raise self.error('FORG0001', err)
+
+
 class XPath2Parser(XPath1Parser):
     """
     XPath 2.0 expression parser class. This is the default parser used by XPath selectors.
@@ -183,9 +246,9 @@ class XPath2Parser(XPath1Parser):
     }
 
     PATH_STEP_LABELS = ('axis', 'function', 'kind test')
-    PATH_STEP_SYMBOLS = {
+    PATH_STEP_SYMBOLS = frozenset((
         '(integer)', '(string)', '(float)', '(decimal)', '(name)', '*', '@', '..', '.', '(', '{'
-    }
+    ))
 
     def __init__(self, namespaces=None, variable_types=None, strict=True, compatibility_mode=False,
                  default_collation=None, default_namespace=None, function_namespace=None,
@@ -294,38 +357,13 @@ class XPath2Parser(XPath1Parser):
     @classmethod
     def constructor(cls, symbol, bp=0, label='constructor function'):
         """Creates a constructor token class."""
-        def nud_(self):
-            try:
-                self.parser.advance('(')
-                self[0:] = self.parser.expression(5),
-                if self.parser.next_token.symbol == ',':
-                    raise self.wrong_nargs('Too many arguments: expected at most 1 argument')
-                self.parser.advance(')')
-                self.value = None
-            except SyntaxError:
-                raise self.error('XPST0017') from None
-            return self
-
-        def evaluate_(self, context=None):
-            arg = self.data_value(self.get_argument(context))
-            if arg is None:
-                return []
-
-            try:
-                if isinstance(arg, UntypedAtomic):
-                    return self.cast(arg.value)
-                return self.cast(arg)
-            except ElementPathError:
-                raise
-            except (TypeError, ValueError) as err:
-                raise self.error('FORG0001', err) from None
-
         def cast_(value):
             raise NotImplementedError
 
         pattern = r'\b%s(?=\s*\(|\s*\(\:.*\:\)\()' % symbol
         token_class = cls.register(symbol, pattern=pattern, label=label, lbp=bp, rbp=bp,
-                                   nud=nud_, evaluate=evaluate_, cast=cast_)
+                                   nud=constructor_nud, evaluate=constructor_evaluate,
+                                   cast=cast_)
 
         def bind(func):
             assert func.__name__ == 'cast', \
@@ -339,28 +377,6 @@ class XPath2Parser(XPath1Parser):
         if atomic_type in {XSD_ANY_ATOMIC_TYPE, XSD_NOTATION}:
             raise xpath_error('XPST0080')
 
-        def nud_(self_):
-            self_.parser.advance('(')
-            self_[0:] = self_.parser.expression(5),
-            self_.parser.advance(')')
-
-            try:
-                self_.value = self_.evaluate()  # Static context evaluation
-            except MissingContextError:
-                self_.value = None
-            return self_
-
-        def evaluate_(self_, context=None):
-            arg = self_.get_argument(context)
-            if arg is None:
-                return []
-
-            value = self_.string_value(arg)
-            try:
-                return self_.parser.schema.cast_as(value, atomic_type)
-            except (TypeError, ValueError) as err:
-                raise self_.error('FORG0001', err)
-
         symbol = get_prefixed_name(atomic_type, self.namespaces)
         token_class_name = str("_%s_constructor_token" % symbol.replace(':', '_'))
         kwargs = {
@@ -369,14 +385,14 @@ class XPath2Parser(XPath1Parser):
             'pattern': r'\b%s(?=\s*\(|\s*\(\:.*\:\)\()' % symbol,
             'lbp': bp,
             'rbp': bp,
-            'nud': nud_,
-            'evaluate': evaluate_,
+            'atomic_type': atomic_type,
+            'nud': schema_constructor_nud,
+            'evaluate': schema_constructor_evaluate,
             '__module__': self.__module__,
             '__qualname__': token_class_name,
             '__return__': None
         }
-        token_class = ABCMeta(token_class_name, (self.token_base_class,), kwargs)
-        MutableSequence.register(token_class)
+        token_class = type(token_class_name, (self.token_base_class,), kwargs)
         self.symbol_table[symbol] = token_class
         return token_class
 
@@ -526,12 +542,12 @@ def select(self, context=None):
 @method('if', bp=20)
 def nud(self):
     self.parser.advance('(')
-    self[:] = self.parser.expression(5),
+    self.append(self.parser.expression(5))
     self.parser.advance(')')
     self.parser.advance('then')
-    self[1:] = self.parser.expression(5),
+    self.append(self.parser.expression(5))
     self.parser.advance('else')
-    self[2:] = self.parser.expression(5),
+    self.append(self.parser.expression(5))
     return self
 
 
@@ -545,7 +561,7 @@ def evaluate(self, context=None):
 
 @method('if')
 def select(self, context=None):
-    if self.boolean_value([x for x in self[0].select(copy(context))]):
+    if self.boolean_value(self[0].select(copy(context))):
         yield from self[1].select(context)
     else:
         yield from self[2].select(context)
@@ -585,16 +601,32 @@ def evaluate(self, context=None):
 
     context = copy(context)
     some = self.symbol == 'some'
+    status = context.item, context.position, context.size, context.axis
+
+    if len(self) == 3:
+        # Single variable binding, computed without the cartesian product
+        varname = self[0][0].value
+        for value in self[1].select(copy(context)):
+            context.variables[varname] = value
+            if self.boolean_value(self[-1].select(context)):
+                if some:
+                    return True
+            elif not some:
+                return False
+            context.item, context.position, context.size, context.axis = status
+        return not some
+
     varnames = [self[k][0].value for k in range(0, len(self) - 1, 2)]
     selectors = [self[k].select for k in range(1, len(self) - 1, 2)]
 
     for results in copy(context).iter_product(selectors, varnames):
-        context.variables.update(x for x in zip(varnames, results))
-        if self.boolean_value([x for x in self[-1].select(copy(context))]):
+        context.variables.update(zip(varnames, results))
+        if self.boolean_value(self[-1].select(context)):
             if some:
                 return True
         elif not some:
             return False
+        context.item, context.position, context.size, context.axis = status
 
     return not some
 
@@ -630,12 +662,24 @@ def select(self, context=None):
         raise self.missing_context()
 
     context = copy(context)
+    status = context.item, context.position, context.size, context.axis
+
+    if len(self) == 3:
+        # Single variable binding, computed without the cartesian product
+        varname = self[0][0].value
+        for value in self[1].select(copy(context)):
+            context.variables[varname] = value
+            yield from self[-1].select(context)
+            context.item, context.position, context.size, context.axis = status
+        return
+
     varnames = [self[k][0].value for k in range(0, len(self) - 1, 2)]
     selectors = [self[k].select for k in range(1, len(self) - 1, 2)]
 
     for results in copy(context).iter_product(selectors, varnames):
-        context.variables.update(x for x in zip(varnames, results))
-        yield from self[-1].select(copy(context))
+        context.variables.update(zip(varnames, results))
+        yield from self[-1].select(context)
+        context.item, context.position, context.size, context.axis = status
 
 
 ###
@@ -655,7 +699,7 @@ def led(self, left):
 
     next_symbol = self.parser.next_token.symbol
     if self[1].symbol != 'empty-sequence' and next_symbol in ('?', '*', '+'):
-        self[2:] = self.parser.symbol_table[next_symbol](self.parser),  # Add nullary token
+        self.append(self.parser.symbol_table[next_symbol](self.parser))  # Add nullary token
         self.parser.advance()
     return self
 
@@ -754,7 +798,7 @@ def led(self, left):
     self.parser.expected_name('(name)', ':')
     self[:] = left, self.parser.expression(rbp=self.rbp)
     if self.parser.next_token.symbol == '?':
-        self[2:] = self.parser.symbol_table['?'](self.parser),  # Add nullary token
+        self.append(self.parser.symbol_table['?'](self.parser))  # Add nullary token
         self.parser.advance()
     return self
 
@@ -776,7 +820,7 @@ def evaluate(self, context=None):
         msg = "atomic type %r not found in the in-scope schema types"
         raise self.unknown_atomic_type(msg % atomic_type)
 
-    result = [res for res in self[0].select(context)]
+    result = [res for res in islice(self[0].select(copy(context)), 2)]
     if len(result) > 1:
         if self.symbol != 'cast':
             return False
@@ -819,10 +863,24 @@ def evaluate(self, context=None):
 
 ###
 # Comma operator - concatenate items or sequences
+def iter_comma_operands(token):
+    """
+    Iterates the operands of a chain of comma operators. The comma operator is left
+    associative, so a long sequence is a left-nested chain. It is walked iteratively
+    instead of concatenating partial results at each level.
+    """
+    operands = []
+    while token.symbol == ',':
+        operands.append(token[1])
+        token = token[0]
+    operands.append(token)
+    return reversed(operands)
+
+
 @method(infix(',', bp=5))
 def evaluate(self, context=None):
     results = []
-    for op in self:
+    for op in iter_comma_operands(self):
         result = op.evaluate(context)
         if isinstance(result, list):
             results.extend(result)
@@ -833,7 +891,7 @@ def evaluate(self, context=None):
 
 @method(',')
 def select(self, context=None):
-    for op in self:
+    for op in iter_comma_operands(self):
         yield from op.select(context=copy(context))
 
 
@@ -842,7 +900,7 @@ def select(self, context=None):
 @method('(')
 def nud(self):
     if self.parser.next_token.symbol != ')':
-        self[:] = self.parser.expression(),
+        self.append(self.parser.expression())
     self.parser.advance(')')
     return self
 
@@ -888,36 +946,36 @@ def led(self, left):
 @method('le')
 @method('ge')
 def evaluate(self, context=None):
-    operands = [self[0].get_atomized_operand(context=copy(context)),
-                self[1].get_atomized_operand(context=copy(context))]
-
-    if any(x is None for x in operands):
+    op1 = self[0].get_atomized_operand(context=copy(context))
+    op2 = self[1].get_atomized_operand(context=copy(context))
+    if op1 is None or op2 is None:
         return
 
-    cls0, cls1 = type(operands[0]), type(operands[1])
+    cls0, cls1 = type(op1), type(op2)
     if cls0 is cls1 and cls0 is not Duration:
         pass
-    elif all(isinstance(x, float) for x in operands):
+    elif isinstance(op1, float) and isinstance(op2, float):
         pass
-    elif all(isinstance(x, (int, Decimal)) for x in operands):
+    elif isinstance(op1, (int, Decimal)) and isinstance(op2, (int, Decimal)):
         pass
-    elif all(isinstance(x, (str, UntypedAtomic, AnyURI)) for x in operands):
+    elif isinstance(op1, (str, UntypedAtomic, AnyURI)) and \
+            isinstance(op2, (str, UntypedAtomic, AnyURI)):
         pass
-    elif all(isinstance(x, (float, Decimal, int)) for x in operands):
-        if isinstance(operands[0], float):
-            operands[1] = float(operands[1])
+    elif isinstance(op1, (float, Decimal, int)) and isinstance(op2, (float, Decimal, int)):
+        if isinstance(op1, float):
+            op2 = float(op2)
         else:
-            operands[0] = float(operands[0])
-    elif all(isinstance(x, Duration) for x in operands) and self.symbol in ('eq', 'ne'):
+            op1 = float(op1)
+    elif isinstance(op1, Duration) and isinstance(op2, Duration) and self.symbol in ('eq', 'ne'):
         pass
     elif (issubclass(cls0, cls1) or issubclass(cls1, cls0)) and not issubclass(cls0, Duration):
         pass
     else:
-        msg = "cannot apply {} between {!r} and {!r}".format(self, *operands)
+        msg = "cannot apply {} between {!r} and {!r}".format(self, op1, op2)
         raise self.error('XPTY0004', msg)
 
     try:
-        return getattr(operator, self.symbol)(*operands)
+        return VALUE_OPERATORS_MAP[self.symbol](op1, op2)
     except TypeError as err:
         raise self.error('XPTY0004', err) from None
 
@@ -939,19 +997,41 @@ def nud(self):
     raise self.wrong_syntax()
 
 
+def document_position(context, node):
+    """
+    Returns a sortable document position for a node of the context's tree, or `None`
+    if the node is not in the tree. Typed nodes are unwrapped and an attribute is
+    placed after its parent element, ordering the attributes of an element by name.
+    """
+    if isinstance(node, TypedElement):
+        node = node.elem
+    elif isinstance(node, TypedAttribute):
+        node = node.attribute
+
+    if isinstance(node, AttributeNode):
+        if node.parent is not None:
+            position = context.document_order.get(node.parent)
+            if position is not None:
+                return position, 1, node.name
+    elif is_etree_element(node):
+        position = context.document_order.get(node)
+        if position is not None:
+            return position, 0, ''
+
+
 @method('is')
 @method(infix('<<', bp=30))
 @method(infix('>>', bp=30))
 def evaluate(self, context=None):
     symbol = self.symbol
 
-    left = [x for x in self[0].select(context)]
+    left = [x for x in islice(self[0].select(copy(context)), 2)]
     if not left:
         return
     elif len(left) > 1 or not is_xpath_node(left[0]):
         raise self[0].error('XPTY0004', "left operand of %r must be a single node" % symbol)
 
-    right = [x for x in self[1].select(context)]
+    right = [x for x in islice(self[1].select(copy(context)), 2)]
     if not right:
         return
     elif len(right) > 1 or not is_xpath_node(right[0]):
@@ -959,16 +1039,19 @@ def evaluate(self, context=None):
 
     if symbol == 'is':
         return left[0] is right[0]
+    elif left[0] is right[0]:
+        return False
+
+    left_position = document_position(context, left[0])
+    right_position = document_position(context, right[0])
+    if left_position is None and right_position is None:
+        raise self.error('FOCA0002', "operands are not nodes of the XML tree!")
+    elif left_position == right_position:
+        return False  # different wrappers of the same node
+    elif right_position is None or left_position is not None and left_position < right_position:
+        return symbol == '<<'
     else:
-        if left[0] is right[0]:
-            return False
-        for item in context.root.iter():  # pragma: no cover
-            if left[0] is item:
-                return True if symbol == '<<' else False
-            elif right[0] is item:
-                return False if symbol == '<<' else True
-        else:
-            raise self.error('FOCA0002', "operands are not nodes of the XML tree!")
+        return symbol == '>>'
 
 
 ###
@@ -983,16 +1066,17 @@ def led(self, left):
 
 @method('to')
 def evaluate(self, context=None):
-    start, stop = self.get_operands(context, cls=Integer)
-    try:
-        return [x for x in range(start, stop + 1)]
-    except TypeError:
-        return []
+    return list(self.select(context))
 
 
 @method('to')
 def select(self, context=None):
-    yield from self.evaluate(context)
+    start, stop = self.get_operands(context, cls=Integer)
+    try:
+        values = range(start, stop + 1)
+    except TypeError:
+        return
+    yield from values
 
 
 ###
@@ -1094,8 +1178,8 @@ def select(self, context=None):
         raise self.missing_context()
 
     attribute_name = self[0].source
+    qname = get_expanded_name(attribute_name, self.parser.namespaces)
     for _ in context.iter_children_or_self():
-        qname = get_expanded_name(attribute_name, self.parser.namespaces)
         if self.parser.schema.get_attribute(qname) is None:
             raise self.missing_name("attribute %r not found in schema" % attribute_name)
 
@@ -1113,8 +1197,8 @@ def select(self, context=None):
         raise self.missing_context()
 
     element_name = self[0].source
+    qname = get_expanded_name(element_name, self.parser.namespaces)
     for _ in context.iter_children_or_self():
-        qname = get_expanded_name(element_name, self.parser.namespaces)
         if self.parser.schema.get_element(qname) is None \
                 and self.parser.schema.get_substitution_group(qname) is None:
             raise self.missing_name("element %r not found in schema" % element_name)
@@ -1178,7 +1262,12 @@ def select(self, context=None):
     if context is None:
         raise self.missing_context()
     elif self.label == 'axis':
-        for _ in context.iter_attributes():
+        if self[0].symbol == '(name)' and not isinstance(context, XPathSchemaContext):
+            attributes = context.iter_attributes(self[0].value)
+        else:
+            attributes = context.iter_attributes()
+
+        for _ in attributes:
             yield from self[0].select(context)
     elif not self:
         for attribute in context.iter_attributes():
@@ -1190,7 +1279,12 @@ def select(self, context=None):
         else:
             type_name = None
 
-        for attribute in context.iter_attributes():
+        if self[0].symbol == '(name)':
+            attributes = context.iter_attributes(name)
+        else:
+            attributes = context.iter_attributes()
+
+        for attribute in attributes:
             if match_attribute_node(attribute, name):
                 if isinstance(context, XPathSchemaContext):
                     self.add_xsd_type(attribute)
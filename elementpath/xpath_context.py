@@ -8,6 +8,7 @@
 # @author Davide Brunato <brunato@sissa.it>
 #
 import datetime
+from contextlib import contextmanager
 from functools import lru_cache
 from itertools import chain
 
@@ -49,6 +50,7 @@ class XPathContext(object):
     """
     _iter_nodes = staticmethod(etree_iter_nodes)
     _parent_map = None
+    _document_order = None
     _elem = None
 
     def __init__(self, root, namespaces=None, item=None, position=1, size=1, axis=None,
@@ -111,6 +113,7 @@ class XPathContext(object):
             obj.item = None
         obj._elem = self._elem
         obj._parent_map = self._parent_map
+        obj._document_order = self._document_order
         return obj
 
     def copy(self, clear_axis=True):
@@ -121,12 +124,33 @@ class XPathContext(object):
             obj.axis = self.axis
             return obj
 
+    @contextmanager
+    def scoped(self):
+        """
+        A context manager for evaluating a subexpression on the context itself instead
+        of on a copy. The axis is cleared on entering and the item, position, size and
+        axis of the context are restored on exit.
+        """
+        status = self.item, self.position, self.size, self.axis
+        self.axis = None
+        try:
+            yield self
+        finally:
+            self.item, self.position, self.size, self.axis = status
+
     @property
     def parent_map(self):
         if self._parent_map is None:
             self._parent_map = {child: elem for elem in self.root.iter() for child in elem}
         return self._parent_map
 
+    @property
+    def document_order(self):
+        """A map from the elements of the tree to their position in document order."""
+        if self._document_order is None:
+            self._document_order = {elem: k for k, elem in enumerate(self.root.iter())}
+        return self._document_order
+
     @lru_cache(maxsize=1024)
     def get_parent(self, elem):
         """
@@ -199,21 +223,28 @@ class XPathContext(object):
         """
         status = self.item
 
+        # Index XSD decoded nodes by their origin node, for matching them in a single pass
+        typed_nodes = {}
+        for item in results:
+            if isinstance(item, TypedAttribute):
+                typed_nodes.setdefault(item.attribute, []).append(item)
+            elif isinstance(item, TypedElement):
+                typed_nodes.setdefault(id(item.elem), []).append(item)
+
         for self.item in self._iter_nodes(self.root, with_attributes=True):
             if self.item in results:
                 yield self.item
 
+            elif not typed_nodes:
+                continue
+
             elif isinstance(self.item, AttributeNode):
                 # Match XSD decoded attributes
-                for typed_attribute in filter(lambda x: isinstance(x, TypedAttribute), results):
-                    if typed_attribute.attribute == self.item:
-                        yield typed_attribute
+                yield from typed_nodes.get(self.item, ())
 
             elif is_etree_element(self.item):
                 # Match XSD decoded elements
-                for typed_element in filter(lambda x: isinstance(x, TypedElement), results):
-                    if typed_element.elem is self.item:
-                        yield typed_element
+                yield from typed_nodes.get(id(self.item), ())
 
         self.item = status
 
@@ -277,8 +308,13 @@ class XPathContext(object):
         yield self.item
         self.axis = status
 
-    def iter_attributes(self):
-        """Iterator for 'attribute' axis and '@' shortcut."""
+    def iter_attributes(self, name=None):
+        """
+        Iterator for 'attribute' axis and '@' shortcut.
+
+        :param name: an optional attribute name, if provided only the attribute \
+        of an element that has this name is iterated.
+        """
         if isinstance(self.item, (AttributeNode, TypedAttribute)):
             status = self.axis
             self.axis = 'attribute'
@@ -295,12 +331,19 @@ class XPathContext(object):
             self.item = self.item.elem
 
         elem = self.item
+        if name is None:
+            attributes = elem.attrib.items()
+        elif name in elem.attrib:
+            attributes = (name, elem.attrib[name]),
+        else:
+            attributes = ()
+
         if is_schema_node(elem):
             # TODO: for backward compatibility, to be removed in release 3.0.
-            for self.item in (AttributeNode(*x) for x in elem.attrib.items()):
+            for self.item in (AttributeNode(*x) for x in attributes):
                 yield self.item
         else:
-            for self.item in (AttributeNode(*x, elem) for x in elem.attrib.items()):
+            for self.item in (AttributeNode(*x, elem) for x in attributes):
                 yield self.item
 
         self.item, self.axis = status
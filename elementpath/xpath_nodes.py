@@ -449,7 +449,7 @@ def node_children(obj):
 
 def node_nilled(obj):
     if is_element_node(obj):
-        return obj.get(XSI_NIL) in ('true', '1')
+        return obj.get(XSI_NIL) in {'true', '1'}
 
 
 def node_kind(obj):
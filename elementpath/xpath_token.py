@@ -24,7 +24,8 @@ import contextlib
 import math
 from copy import copy
 from decimal import Decimal
-from itertools import product
+from collections.abc import Iterator
+from itertools import product, islice
 from typing import Union
 import urllib.parse
 from xml.etree.ElementTree import Element
@@ -806,8 +807,12 @@ class XPathToken(Token):
     # XPath data accessors base functions
     def boolean_value(self, obj):
         """
-        The effective boolean value, as computed by fn:boolean().
+        The effective boolean value, as computed by fn:boolean(). If the argument
+        is an iterator only the items needed for computing the value are consumed.
         """
+        if isinstance(obj, Iterator):
+            obj = list(islice(obj, 2))
+
         if isinstance(obj, list):
             if not obj:
                 return False
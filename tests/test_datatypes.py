@@ -28,7 +28,7 @@ from elementpath.datatypes import DateTime, DateTime10, Date, Date10, Time, \
     BooleanProxy, DecimalProxy, DoubleProxy10, DoubleProxy, StringProxy
 from elementpath.datatypes.atomic_types import AtomicTypeABCMeta
 from elementpath.datatypes.helpers import MONTH_DAYS, MONTH_DAYS_LEAP, \
-    days_from_common_era, months2days, round_number
+    days_from_common_era, months2days, round_number, collapse_white_spaces
 from elementpath.datatypes.datetime import OrderedDateTime
 
 
@@ -74,6 +74,13 @@ class StringTypesTest(unittest.TestCase):
         self.assertTrue(is_idrefs('alpha beta'))
         self.assertFalse(is_idrefs('12345'))
 
+    def test_collapse_white_spaces_function(self):
+        self.assertEqual(collapse_white_spaces(''), '')
+        self.assertEqual(collapse_white_spaces('alpha'), 'alpha')
+        self.assertEqual(collapse_white_spaces('  alpha\t\n beta \r'), 'alpha beta')
+        self.assertEqual(collapse_white_spaces(' alpha\xa0 beta '), 'alpha\xa0 beta')
+        self.assertEqual(collapse_white_spaces('\xa0 alpha \xa0'), '\xa0 alpha \xa0')
+
     def test_new_instance(self):
         self.assertEqual(NormalizedString('  a b\t c\n'), '  a b  c ')
         self.assertEqual(NormalizedString(10.0), '10.0')
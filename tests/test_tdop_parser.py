@@ -12,7 +12,8 @@ import unittest
 import re
 from collections import namedtuple
 
-from elementpath.tdop import symbol_to_identifier, Parser, MultiLabel
+from elementpath.tdop import symbol_to_identifier, trie_alternation, \
+    group_word_patterns, Parser, MultiLabel
 
 
 FakeToken = namedtuple('Token', 'symbol pattern')
@@ -90,6 +91,33 @@ class TdopParserTest(unittest.TestCase):
         self.assertEqual(symbol_to_identifier('my-api-call'), 'my_api_call')
         self.assertEqual(symbol_to_identifier('call-'), 'call_')
 
+    def test_parser_symbols(self):
+        self.assertIsInstance(Parser.SYMBOLS, frozenset)
+        self.assertIsInstance(ExpressionParser.SYMBOLS, frozenset)
+        self.assertEqual(ExpressionParser.SYMBOLS, {'(integer)', '+', '-', '(name)', '(end)'})
+
+    def test_trie_alternation_function(self):
+        self.assertEqual(trie_alternation([]), '')
+        self.assertEqual(trie_alternation(['call']), 'call')
+        self.assertEqual(trie_alternation(['unsignedLong', 'unsignedInt', 'unsignedByte']),
+                         'unsigned(?:Byte|Int|Long)')
+        self.assertEqual(trie_alternation(['id', 'idref', 'idrefs']), 'id(?:ref(?:s)?)?')
+        self.assertEqual(trie_alternation(['a-b', 'a']), r'a(?:\-b)?')
+
+        pattern = re.compile(r'^(?:%s)$' % trie_alternation(['id', 'idref', 'idrefs', 'in']))
+        for word in ['id', 'idref', 'idrefs', 'in']:
+            self.assertIsNotNone(pattern.match(word))
+        for word in ['', 'i', 'idre', 'ins']:
+            self.assertIsNone(pattern.match(word))
+
+    def test_group_word_patterns_function(self):
+        self.assertListEqual(group_word_patterns([r'\bcall(?=\()', '+']),
+                             ['+', r'\bcall(?=\()'])
+        self.assertListEqual(
+            group_word_patterns([r'\bcall(?=\()', r'\bcount(?=\()', r'\bor\b(?!-)']),
+            [r'\bc(?:all|ount)(?=\()', r'\bor\b(?!-)']
+        )
+
     def test_create_tokenizer_method(self):
         pattern = Parser.create_tokenizer(create_fake_tokens(['(name)', 'call', '+']))
         self.assertEqual(pattern.pattern, r"""
@@ -99,6 +127,8 @@ class TdopParserTest(unittest.TestCase):
             (\S) |       # Unknown symbols
             \s+          # Skip extra spaces
         """)
+        self.assertIs(Parser.create_tokenizer(create_fake_tokens(['(name)', 'call', '+'])),
+                      pattern)
 
         with self.assertRaises(ValueError):
             Parser.create_tokenizer(create_fake_tokens(['(name)', 'wrong pattern', '+']))
@@ -1377,6 +1377,9 @@ class XPath1ParserTest(xpath_test_class.XPathTestCase):
         self.check_selector('/A/B1/@*', root, ['beta1'])
         self.check_selector('/A/B3/attribute::*', root, {'beta2', 'beta3'})
         self.check_selector('/A/attribute::*', root, {'1', 'alpha'})
+        self.check_selector('/A/B3/@b3', root, ['beta3'])
+        self.check_selector('/A/B3/attribute::b4', root, [])
+        self.check_selector('/A/*[@b2]/@b3', root, ['beta3'])
 
         root = self.etree.XML('<value choice="int">10</value>')
         self.check_selector('@choice', root, ['int'])
@@ -595,6 +595,14 @@ class XPath2FunctionsTest(xpath_test_class.XPathTestCase):
         self.check_value('fn:exists(fn:remove(("hello"), 1))', False)
         self.check_value('fn:exists((xs:int("-1873914410")))', True)
 
+        root = self.etree.XML('<root/>')
+        context = XPathContext(root, variables={'a': [], 'b': [1, 2], 'c': 0})
+        self.check_value('fn:exists($a)', False, context)
+        self.check_value('fn:exists($b)', True, context)
+        self.check_value('fn:exists($c)', True, context)
+        self.check_value('fn:empty($a)', True, context)
+        self.check_value('fn:empty($c)', False, context)
+
     def test_distinct_values_function(self):
         self.check_value('fn:distinct-values((1, 2.0, 3, 2))', [1, 2.0, 3])
         context = XPathContext(
@@ -605,6 +613,15 @@ class XPath2FunctionsTest(xpath_test_class.XPathTestCase):
         )
         self.check_value('fn:distinct-values($x)', ['foo', 'bar'], context)
 
+        context = XPathContext(
+            root=self.etree.XML('<root/>'),
+            variables={'x': ['foo', UntypedAtomic("foo"), 'bar', UntypedAtomic("bar"), 'foo']}
+        )
+        self.check_value('fn:distinct-values($x)', ['foo', 'bar'], context)
+        self.check_value('fn:distinct-values((xs:dateTime("2000-01-01T00:00:00"), '
+                         'xs:dateTime("2000-01-01T00:00:00Z")))',
+                         [DateTime(2000, 1, 1)])
+
         context = XPathContext(
             root=self.etree.XML('<root/>'),
             variables={'x': [UntypedAtomic("foo"), float('nan'), UntypedAtomic("bar")]}
@@ -689,6 +706,14 @@ class XPath2FunctionsTest(xpath_test_class.XPathTestCase):
                          [1, 2, 3, 4, 5, 6, 7])
         self.check_value('fn:subsequence((1, 2, 3, 4, 5, 6, 7), 5, xs:float("-INF"))', [])
         self.check_value('fn:subsequence((1, 2, 3, 4, 5, 6, 7), 5, xs:float("INF"))', [5, 6, 7])
+        self.check_value('fn:subsequence((1, 2, 3, 4, 5, 6, 7), 5, xs:float("NaN"))', [])
+        self.check_value('fn:subsequence((1, 2, 3, 4, 5, 6, 7), xs:float("-INF"), '
+                         'xs:float("INF"))', [])
+
+        root = self.etree.XML('<A><B1/><B2/><B3/><B4/></A>')
+        self.check_selector('fn:subsequence(*, 2, 2)', root, root[1:3])
+        self.check_selector('fn:subsequence(*, 2, 1)/..', root, [root])
+        self.check_selector('(fn:subsequence(*, 1, 1), *)', root, root[:1] + root[:])
 
     def test_unordered_function(self):
         self.check_value('fn:unordered(())', [])
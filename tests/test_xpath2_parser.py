@@ -41,7 +41,7 @@ else:
 from elementpath import *
 from elementpath.datatypes import xsd10_atomic_types, xsd11_atomic_types, DateTime, \
     Date, Time, Timezone, DayTimeDuration, YearMonthDuration, UntypedAtomic, QName
-from elementpath.xpath_nodes import node_kind
+from elementpath.xpath_nodes import AttributeNode, TypedElement, node_kind
 
 try:
     from tests import test_xpath1_parser
@@ -250,9 +250,12 @@ class XPath2ParserTest(test_xpath1_parser.XPath1ParserTest):
         self.check_value("10 to 10", [10])
         self.check_value("15 to 10", [])
         self.check_value("fn:reverse(10 to 15)", [15, 14, 13, 12, 11, 10])
+        self.check_value("() to 10", [])
         self.wrong_syntax("1 to 10 to 20", 'XPST0003')
 
         root = self.etree.XML('<root/>')
+        self.check_select("1 to 3", [1, 2, 3], context=XPathContext(root))
+        self.check_select("3 to 1", [], context=XPathContext(root))
         self.wrong_type("'1' to '10'", 'XPTY0004', context=XPathContext(root))
         self.wrong_type("true() to 10", 'XPTY0004')
 
@@ -761,6 +764,7 @@ class XPath2ParserTest(test_xpath1_parser.XPath1ParserTest):
         self.check_select("attribute(*)", {'10', '20'}, context)
         self.check_select("attribute(a)", ['10'], context)
         self.check_select("attribute(a, xs:int)", ['10'], context)
+        self.check_select("attribute(c)", [], context)
 
         if xmlschema is not None:
             schema = xmlschema.XMLSchema("""
@@ -860,6 +864,20 @@ class XPath2ParserTest(test_xpath1_parser.XPath1ParserTest):
         self.wrong_value('$a << $b', 'FOCA0002', 'operands are not nodes of the XML tree',
                          context=context)
 
+        root = self.etree.XML('<A><B1 a="1" b="2"/><B2/></A>')
+        context = XPathContext(root, variables={
+            't': TypedElement(root[0], None, [1, 2]),
+            'u': TypedElement(root[0], None, [1, 2]),
+            'a': AttributeNode('a', '1', root[0]),
+        })
+        self.check_value('$t << B2', True, context=context)
+        self.check_value('$t >> B2', False, context=context)
+        self.check_value('$t << $u', False, context=context)
+        self.check_value('$t << $a', True, context=context)
+        self.check_value('$a << B1/@b', True, context=context)
+        self.check_value('$a >> B1', True, context=context)
+        self.check_value('$a << B2', True, context=context)
+
         root = self.etree.XML('''
         <transactions>
             <purchase><parcel>28-451</parcel></purchase>
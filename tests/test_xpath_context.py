@@ -73,6 +73,33 @@ class XPathContextTest(unittest.TestCase):
             context = XPathContext(root, item=TypedElement(root, xsd_type, None))
             self.assertEqual(context.parent_map, result)
 
+    def test_document_order(self):
+        root = ElementTree.XML('<A><B1><C1/></B1><B2/></A>')
+        context = XPathContext(root)
+        self.assertIsNone(context._document_order)
+
+        result = {root: 0, root[0]: 1, root[0][0]: 2, root[1]: 3}
+        self.assertEqual(context.document_order, result)
+        self.assertIs(context.copy().document_order, context.document_order)
+
+    def test_scoped(self):
+        root = ElementTree.XML('<A><B1><C1/></B1><B2/></A>')
+        context = XPathContext(root, item=root[0], position=2, size=3, axis='child')
+
+        with context.scoped() as inner:
+            self.assertIs(inner, context)
+            self.assertIsNone(context.axis)
+            context.item, context.position, context.size = root[1], 1, 1
+
+        self.assertIs(context.item, root[0])
+        self.assertEqual((context.position, context.size, context.axis), (2, 3, 'child'))
+
+        with self.assertRaises(ValueError):
+            with context.scoped():
+                context.item = root[1]
+                raise ValueError()
+        self.assertIs(context.item, root[0])
+
     def test_get_parent(self):
         root = ElementTree.XML('<A><B1><C1/></B1><B2/><B3><C1/><C2 max="10"/></B3></A>')
 
@@ -193,6 +220,9 @@ class XPathContextTest(unittest.TestCase):
         attributes = [AttributeNode(*x, parent=root) for x in root.attrib.items()]
         context = XPathContext(root)
         self.assertListEqual(list(context.iter_attributes()), attributes)
+        self.assertListEqual(list(context.iter_attributes('a2')), attributes[1:])
+        self.assertListEqual(list(context.iter_attributes('a3')), [])
+        self.assertIs(context.item, root)
 
         context.item = AttributeNode('a1', '10', root)
         self.assertListEqual(list(context.iter_attributes()),
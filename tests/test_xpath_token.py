@@ -213,6 +213,15 @@ class XPath1TokenTest(unittest.TestCase):
         self.assertTrue(token.boolean_value(1.0))
         self.assertFalse(token.boolean_value(None))
 
+        self.assertFalse(token.boolean_value(iter([])))
+        self.assertTrue(token.boolean_value(iter([1])))
+        with self.assertRaises(TypeError):
+            token.boolean_value(iter([1, 1]))
+
+        items = iter([elem, 1, 2])
+        self.assertTrue(token.boolean_value(items))
+        self.assertListEqual(list(items), [2])
+
     def test_data_value_function(self):
         token = self.parser.parse('true()')
 